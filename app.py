@@ -1,37 +1,26 @@
 import streamlit as st
-from src.transcription import VideoTranscriptionService
+from src.transcription import VideoTranscriptionService, AudioConditioner
 from secret_keys import get_open_ai_key, get_anthropic_key
-from src.content_processing import ContentAnalyzer
+from src.content_processing import ContentAnalyzer, TranscriptCompactor
 from src.presentation import SlideGenerator
 from src.image_service import ImageGenerator
+from src.model_routing import ModelRouter
+from src.pipeline import build_presentation_pipeline, PipelineCancelled
+from eval import calculate_similarity
 import os
-import pickle
-import urllib.request
-import json
+import time
 
-def extract_youtube_title(url):
-    """Extract the title of a YouTube video from its URL."""
-    try:
-        video_id = None
-        if "v=" in url:
-            video_id = url.split("v=")[1].split("&")[0]
-        elif "youtu.be/" in url:
-            video_id = url.split("youtu.be/")[1].split("?")[0]
-        
-        if not video_id:
-            return None
-            
-        url = f"https://www.youtube.com/oembed?url=http://www.youtube.com/watch?v={video_id}"
-        with urllib.request.urlopen(url) as response:
-            response_text = response.read()
-            data = json.loads(response_text.decode())
-            return data['title']
-    except Exception as e:
-        st.warning(f"Could not extract title: {e}")
-        return None
+def cancel_generation():
+    # Clicking Cancel reruns the script, so Streamlit stops the generating run at its
+    # next on_poll; Pipeline.run then marks itself cancelled, and stages already in
+    # flight stop before their next paid call (a call in progress still completes)
+    st.session_state['cancelled'] = True
 
 def create_app():
     st.title("VideoAIGist - YouTube Video to PowerPoint")
+
+    if st.session_state.pop('cancelled', False):
+        st.warning("Generation cancelled.")
     
     # Input fields
     youtube_url = st.text_input("YouTube Video URL")
@@ -52,47 +41,43 @@ def create_app():
                     os.environ['ANTHROPIC_API_KEY'] = claude_api_key
 
                     # Initialize services
-                    service = VideoTranscriptionService(api_key=api_key)
-                    image_generator = ImageGenerator(api_key=api_key, output_dir="temp_images")
-                    analyzer = ContentAnalyzer(api_key=claude_api_key, num_slides=num_slides)
+                    service = VideoTranscriptionService(api_key=api_key, conditioner=AudioConditioner(tempo=1.25))
+                    router = ModelRouter()
+                    image_generator = ImageGenerator(api_key=api_key, output_dir="temp_images", router=router)
+                    analyzer = ContentAnalyzer(api_key=claude_api_key, num_slides=num_slides, router=router)
                     slide_generator = SlideGenerator()
 
-                    # Get video title
-                    presentation_title = extract_youtube_title(youtube_url)
-                    if not presentation_title:
-                        presentation_title = "YouTube Video Summary"
+                    pipeline = build_presentation_pipeline(
+                        service=service,
+                        analyzer=analyzer,
+                        image_generator=image_generator,
+                        slide_generator=slide_generator,
+                        num_slides=num_slides,
+                        num_images=num_images,
+                        compactor=TranscriptCompactor(count_tokens=router.count_tokens),
+                        fidelity_check=calculate_similarity
+                    )
 
-                with st.spinner("Transcribing video..."):
-                    try:
-                        transcript = service.transcribe_youtube_video(url=youtube_url, language="en")
-                        with open("transcript.pkl", "wb") as f:
-                            pickle.dump(transcript, f)
-                    except Exception as e:
-                        st.warning("Error getting transcript, attempting to load from backup...")
-                        transcript = pickle.load(open("transcript.pkl", "rb"))
+                st.button("Cancel", on_click=cancel_generation)
 
-                with st.spinner("Analyzing content..."):
-                    slides = analyzer.analyze_transcript(transcript)
+                with st.spinner("Generating PowerPoint..."):
+                    progress_bar = st.progress(0)
+                    status = st.empty()
+                    elapsed = st.empty()
+                    started = time.monotonic()
 
-                if num_images > 0:
-                    with st.spinner("Generating images..."):
-                        slide_scores = [(i, image_generator.analyze_slide_worthiness(slide)) 
-                                      for i, slide in enumerate(slides)]
-                        top_slides = sorted(slide_scores, key=lambda x: x[1], reverse=True)[:num_images]
+                    def on_stage_complete(name, done, total):
+                        progress_bar.progress(done / total)
+                        status.text(f"Finished {name} ({done}/{total})")
 
-                        progress_bar = st.progress(0)
-                        for idx, (slide_index, score) in enumerate(top_slides):
-                            slide = slides[slide_index]
-                            prompt = image_generator.generate_image_prompt(slide)
-                            image_path = image_generator.generate_and_save_image(prompt, slide_index)
-                            slides[slide_index]['image_path'] = image_path
-                            progress_bar.progress((idx + 1) / len(top_slides))
+                    def on_poll():
+                        # Touching the page lets Streamlit stop this run when Cancel is clicked
+                        elapsed.caption(f"Elapsed: {time.monotonic() - started:.0f}s")
 
-                with st.spinner("Generating PowerPoint..."):
-                    slide_generator.generate_presentation(
-                        slides_content=slides,
-                        output_path=output_filename,
-                        presentation_title=presentation_title
+                    pipeline.run(
+                        {'youtube_url': youtube_url, 'output_filename': output_filename},
+                        on_stage_complete=on_stage_complete,
+                        on_poll=on_poll
                     )
 
                 # Provide download link
@@ -105,7 +90,10 @@ def create_app():
                             mime="application/vnd.openxmlformats-officedocument.presentationml.presentation"
                         )
                     st.success("PowerPoint generated successfully!")
+                    st.text(router.report())
 
+            except PipelineCancelled:
+                st.warning("Generation cancelled.")
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
         else:
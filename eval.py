@@ -4,7 +4,7 @@ from sklearn.metrics.pairwise import cosine_similarity
 import pickle
 import re
 
-def extract_text_from_pptx(pptx_path):
+def extract_slide_texts(pptx_path):
     prs = Presentation(pptx_path)
     text_content = []
     
@@ -15,7 +15,10 @@ def extract_text_from_pptx(pptx_path):
                 slide_text.append(shape.text.strip())
         text_content.append(" ".join(slide_text))
     
-    return " ".join(text_content)
+    return text_content
+
+def extract_text_from_pptx(pptx_path):
+    return " ".join(extract_slide_texts(pptx_path))
 
 def clean_text(text):
     text = text.lower()
@@ -33,6 +36,18 @@ def calculate_similarity(transcript_text, pptx_text):
     similarity_score = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
     return similarity_score
 
+def calculate_redundancy(pptx_path):
+    """Mean pairwise TF-IDF cosine similarity between slides (lower is less repetitive)."""
+    slide_texts = [clean_text(text) for text in extract_slide_texts(pptx_path)]
+    slide_texts = [text for text in slide_texts if text]
+    if len(slide_texts) < 2:
+        return 0.0
+    
+    tfidf_matrix = TfidfVectorizer().fit_transform(slide_texts)
+    similarities = cosine_similarity(tfidf_matrix)
+    n = len(slide_texts)
+    return (similarities.sum() - n) / (n * (n - 1))
+
 def analyze_content(transcript_path, pptx_path):
     with open(transcript_path, 'rb') as f:
         transcript_data = pickle.load(f)
@@ -52,4 +67,5 @@ if __name__ == "__main__":
     pptx_path = "output.pptx"
     
     similarity_score = analyze_content(transcript_path, pptx_path)
-    print(f"Content Similarity Score: {similarity_score:.2f}")
\ No newline at end of file
+    print(f"Content Similarity Score: {similarity_score:.2f}")
+    print(f"Slide Redundancy Score: {calculate_redundancy(pptx_path):.2f}")
\ No newline at end of file
@@ -1,3 +1,5 @@
 from .analyzer import ContentAnalyzer
+from .compactor import TranscriptCompactor
+from .deduplicator import SectionDeduplicator
 
-__all__ = ['ContentAnalyzer']
\ No newline at end of file
+__all__ = ['ContentAnalyzer', 'TranscriptCompactor', 'SectionDeduplicator']
\ No newline at end of file
@@ -1,14 +1,38 @@
 from langchain_anthropic import ChatAnthropic
 from langchain.prompts import ChatPromptTemplate
+from langchain_core.messages import HumanMessage, SystemMessage
+from src.model_routing import ModelRouter
+from .deduplicator import SectionDeduplicator
+
+# Shared by every call so it can sit in the cached prompt prefix ahead of the transcript
+SYSTEM_PROMPT = """You turn video transcripts into presentation slides.
+Everything you write must be relevant to and taken from the transcript you are given.
+Follow the requested output format exactly."""
+
+PROMPT_CACHING_BETA = "prompt-caching-2024-07-31"
+
+
+def default_llm_factory(model: str):
+    return ChatAnthropic(model=model, default_headers={"anthropic-beta": PROMPT_CACHING_BETA})
+
 
 class ContentAnalyzer:
-    def __init__(self, api_key: str, num_slides: int):
-        self.llm = ChatAnthropic(model="claude-3-opus-20240229")
+    def __init__(self, api_key: str, num_slides: int, router: ModelRouter = None,
+                 use_chapters: bool = True, deduplicator: SectionDeduplicator = None,
+                 ground_sections: bool = False, llm_factory=default_llm_factory):
+        self.router = router or ModelRouter()
+        self.deduplicator = deduplicator or SectionDeduplicator()
+        self.llm_factory = llm_factory
+        self._llms = {}
         self.num_slides = num_slides
+        self.use_chapters = use_chapters
+        # Off by default: a grounded section resends the whole transcript, and that
+        # prefix counts towards the router's size-based tier selection
+        self.ground_sections = ground_sections
         
-        # Outline prompt remains same
+        # The transcript itself is sent in the cached prefix (see _build_messages)
         self.outline_prompt = ChatPromptTemplate.from_template("""
-            Analyze this transcript and create exactly {num_slides} main sections.
+            Analyze the transcript above and create exactly {num_slides} main sections.
             Make sure that all the content that you generate is relevant to and from the transcript.
             
             Your response MUST follow this EXACT format for each section:
@@ -24,26 +48,51 @@ class ContentAnalyzer:
             - A clear, descriptive title
             - At least 3 key points
             - All content directly from the transcript
-            
-            Transcript: {transcript}
         """)
 
+    def _invoke(self, model: str, prompt) -> tuple[str, dict]:
+        if model not in self._llms:
+            self._llms[model] = self.llm_factory(model)
+        response = self._llms[model].invoke(prompt)
+
+        raw = getattr(response, 'response_metadata', {}).get('usage', {})
+        usage = {
+            'cache_read_tokens': raw.get('cache_read_input_tokens') or 0,
+            'cache_write_tokens': raw.get('cache_creation_input_tokens') or 0,
+        }
+        if raw.get('input_tokens') is not None:
+            usage['input_tokens'] = raw['input_tokens']
+        return response.content, usage
+
+    def uses_shared_prefix(self, section: dict) -> bool:
+        """Whether expanding this section sends the full transcript in the cached prefix."""
+        return self.ground_sections and not section.get('transcript')
+
+    def _build_messages(self, instructions: str, transcript: str = None, cache: bool = True) -> list:
+        """
+        Stable prefix (system prompt + transcript, marked for provider-side
+        caching when `cache`) followed by the call-specific instructions.
+        Every call on the same model and transcript shares the prefix byte for byte.
+        """
+        content = []
+        if transcript:
+            block = {"type": "text", "text": f"Transcript: {transcript}"}
+            if cache:
+                block["cache_control"] = {"type": "ephemeral"}
+            content.append(block)
+        content.append({"type": "text", "text": instructions})
+        return [SystemMessage(content=SYSTEM_PROMPT), HumanMessage(content=content)]
+
+    def _outline_instructions(self, num_slides: int) -> str:
+        return self.outline_prompt.format_messages(num_slides=num_slides)[0].content
+
     def _validate_slide_content(self, slide_content: dict) -> bool:
         has_title = bool(slide_content['title'])
         has_points = len(slide_content['points']) >= 3  # Require at least 3 substantial points
         has_notes = len(slide_content['speaker_notes']) >= 1
         return has_title and has_points and has_notes
 
-    def _create_outline(self, transcript: str) -> list[dict]:
-        # This method remains exactly same as before
-        response = self.llm.invoke(
-            self.outline_prompt.format(
-                num_slides=self.num_slides,
-                transcript=transcript
-            )
-        )
-        
-        response_text = response.content
+    def _parse_outline(self, response_text: str) -> list[dict]:
         sections = []
         current_section = {}
 
@@ -56,7 +105,7 @@ class ContentAnalyzer:
                     'title': line.replace('SECTION:', '').strip(),
                     'key_points': []
                 }
-            elif line.startswith('-'):
+            elif line.startswith('-') and current_section:
                 point = line[1:].strip()
                 if point:
                     current_section['key_points'].append(point)
@@ -66,6 +115,147 @@ class ContentAnalyzer:
 
         return sections
 
+    def _insert_in_order(self, sections: list[dict], replacements: list[dict],
+                         transcript: str) -> list[dict]:
+        """
+        Slot replacement sections in among the existing ones by where their
+        material sits in the transcript; the existing sections keep their order.
+        """
+        positions = self.deduplicator.locate(sections + replacements, transcript)
+        anchors, replacement_positions = positions[:len(sections)], positions[len(sections):]
+
+        slots = {}  # index of the section a replacement goes before -> replacements
+        for replacement, position in sorted(zip(replacements, replacement_positions),
+                                            key=lambda pair: pair[1]):
+            slot = next((j for j, anchor in enumerate(anchors) if anchor > position), len(sections))
+            slots.setdefault(slot, []).append(replacement)
+
+        ordered = []
+        for j, section in enumerate(sections):
+            ordered += slots.get(j, []) + [section]
+        return ordered + slots.get(len(sections), [])
+
+    def create_outline(self, transcript: str) -> list[dict]:
+        # Not cached: caches are per model and the outline tier differs from the
+        # section tier, so only the occasional top-up could read a cache written here
+        response_text = self.router.run(
+            'outline', 'anthropic',
+            self._build_messages(self._outline_instructions(self.num_slides), transcript, cache=False),
+            self._invoke
+        )
+        parsed = self._parse_outline(response_text)
+        sections = self.deduplicator.deduplicate(parsed)
+
+        missing = self.num_slides - len(sections)
+        if missing > 0:
+            # One top-up round: ask only for the shortfall, excluding what we already have
+            reason = "after merging duplicates" if len(sections) < len(parsed) else "to reach the requested count"
+            print(f"Requesting {missing} replacement section(s) {reason}...")
+            existing = '\n'.join(f"- {section['title']}" for section in sections)
+            instructions = self._outline_instructions(missing) + f"""
+            Do NOT repeat or overlap with these existing sections:
+            {existing}
+            """
+            prompt = self._build_messages(instructions, transcript, cache=False)
+            response_text = self.router.run('outline', 'anthropic', prompt, self._invoke)
+            combined = self.deduplicator.deduplicate(sections + self._parse_outline(response_text),
+                                                     keep=len(sections))
+            replacements = combined[len(sections):][:missing]
+            sections = self._insert_in_order(combined[:len(sections)], replacements, transcript)
+
+        return sections[:self.num_slides]
+
+    def _fit_chapters(self, chapters: list[dict]) -> list[dict]:
+        """Merge the shortest neighbours / split the longest chapters until there are num_slides."""
+        chapters = [dict(chapter) for chapter in chapters]
+        duration = lambda c: c['end_time'] - c['start_time']
+
+        while len(chapters) > self.num_slides:
+            i = min(range(len(chapters) - 1),
+                    key=lambda i: duration(chapters[i]) + duration(chapters[i + 1]))
+            first, second = chapters[i], chapters[i + 1]
+            chapters[i:i + 2] = [{
+                'title': f"{first['title']} / {second['title']}",
+                'start_time': first['start_time'],
+                'end_time': second['end_time'],
+            }]
+
+        # Hand out extra slides one at a time to whichever chapter has the longest pieces
+        pieces = [1] * len(chapters)
+        for _ in range(self.num_slides - len(chapters)):
+            i = max(range(len(chapters)), key=lambda i: duration(chapters[i]) / pieces[i])
+            pieces[i] += 1
+
+        fitted = []
+        for chapter, count in zip(chapters, pieces):
+            step = duration(chapter) / count
+            for part in range(count):
+                fitted.append({
+                    'title': chapter['title'] if count == 1 else f"{chapter['title']} (part {part + 1})",
+                    'start_time': chapter['start_time'] + part * step,
+                    'end_time': chapter['start_time'] + (part + 1) * step,
+                })
+        return fitted
+
+    def _chapter_text(self, chapter: dict, segments: list[dict], is_last: bool) -> str:
+        return ' '.join(
+            seg['text'].strip() for seg in segments
+            if chapter['start_time'] <= (seg['start'] + seg['end']) / 2
+            and (is_last or (seg['start'] + seg['end']) / 2 < chapter['end_time'])
+        )
+
+    def _merge_empty_chapters(self, chapters: list[dict], segments: list[dict]) -> list[dict]:
+        """
+        Fold chapters with no transcript text (music-only, or emptied by VAD /
+        compaction) into the previous chapter, or the next one if they lead.
+        """
+        kept = []
+        leading_start = None
+        for index, chapter in enumerate(chapters):
+            if self._chapter_text(chapter, segments, index == len(chapters) - 1):
+                chapter = dict(chapter)
+                if leading_start is not None:
+                    chapter['start_time'] = leading_start
+                    leading_start = None
+                kept.append(chapter)
+            elif kept:
+                kept[-1] = {**kept[-1], 'end_time': chapter['end_time']}
+            elif leading_start is None:
+                leading_start = chapter['start_time']
+        return kept
+
+    def create_outline_from_chapters(self, chapters: list[dict], segments: list[dict]) -> list[dict]:
+        """
+        Build the outline from the video's own chapters instead of asking the LLM.
+        Each section carries only its chapter's slice of the transcript; returns
+        [] when no chapter has any transcript text.
+        """
+        chapters = self._merge_empty_chapters(chapters, segments)
+        if not chapters:
+            return []
+        # Splitting a chapter can still leave a piece that falls entirely in a pause
+        fitted = self._merge_empty_chapters(self._fit_chapters(chapters), segments)
+        return [
+            {
+                'title': chapter['title'],
+                'key_points': [],
+                'transcript': self._chapter_text(chapter, segments, index == len(fitted) - 1),
+            }
+            for index, chapter in enumerate(fitted)
+        ]
+
+    def build_outline(self, transcript: str, chapters: list[dict] = None,
+                      segments: list[dict] = None) -> list[dict]:
+        """Use the chapter fast path when the video has chapters, otherwise the LLM outline."""
+        if self.use_chapters and chapters and segments:
+            print(f"Building outline from {len(chapters)} video chapters...")
+            sections = self.create_outline_from_chapters(chapters, segments)
+            if sections:
+                return sections
+            print("No chapter has transcript text, falling back to an LLM outline...")
+        print("Creating outline...")
+        return self.create_outline(transcript)
+
     def _parse_slide_content(self, response_text: str) -> dict:
         slide_content = {
             'title': '',
@@ -89,59 +279,62 @@ class ContentAnalyzer:
                     
         return slide_content
 
-    def _extract_detailed_content(self, sections: list[dict]) -> list[dict]:
-        detailed_slides = []
-
-        for section in sections:
-            prompt = f"""
-                Create presentation slide content for this section.
-                Section: {section['title']}
-                Key Points: {'\n'.join(section['key_points'])}
-
-                Your response MUST follow this EXACT format:
-                TITLE: [clear, concise title]
-                
-                SLIDE CONTENT:
-                - [comprehensive bullet point (1-2 lines)]
-                - [comprehensive bullet point (1-2 lines)]
-                - [comprehensive bullet point (1-2 lines)]
-                - [comprehensive bullet point (1-2 lines)]
-                - [optional fourth point if needed]
-                
-                SPEAKER NOTES:
-                - [additional context/details for presenter]
-                - [examples or elaboration]
-
-                Requirements:
-                - Each SLIDE CONTENT point must be a complete, informative statement
-                - 4-5 substantial points per slide
-                - Points should be presentation-friendly and readable
-                - Speaker notes should provide additional context
-                - All content must come from the transcript
-            """
-
-            response = self.llm.invoke(
-                ChatPromptTemplate.from_template(prompt).format_messages(
-                    section_title=section['title'],
-                    key_points='\n'.join(section['key_points'])
-                )
-            )
+    def expand_section(self, section: dict, transcript: str = None) -> dict:
+        """
+        `transcript` grounds the expansion in the full transcript via the
+        cached prefix; sections that carry their own chapter slice use that instead.
+        """
+        key_points = '\n'.join(section['key_points'])
+        context = f"Key Points: {key_points}"
+        if section.get('transcript'):
+            context = f"Transcript excerpt: {section['transcript']}"
+        if not self.uses_shared_prefix(section):
+            transcript = None
+        instructions = f"""
+            Create presentation slide content for this section.
+            Section: {section['title']}
+            {context}
 
-            slide_content = self._parse_slide_content(response.content)
+            Your response MUST follow this EXACT format:
+            TITLE: [clear, concise title]
             
-            if not self._validate_slide_content(slide_content):
-                print(f"Retrying content generation for section: {section['title']}")
-                retry_prompt = prompt + "\nPrevious attempt was incomplete. Please ensure all required sections are included."
-                response = self.llm.invoke(ChatPromptTemplate.from_template(retry_prompt))
-                slide_content = self._parse_slide_content(response.content)
+            SLIDE CONTENT:
+            - [comprehensive bullet point (1-2 lines)]
+            - [comprehensive bullet point (1-2 lines)]
+            - [comprehensive bullet point (1-2 lines)]
+            - [comprehensive bullet point (1-2 lines)]
+            - [optional fourth point if needed]
             
-            detailed_slides.append(slide_content)
+            SPEAKER NOTES:
+            - [additional context/details for presenter]
+            - [examples or elaboration]
 
-        return detailed_slides
+            Requirements:
+            - Each SLIDE CONTENT point must be a complete, informative statement
+            - 4-5 substantial points per slide
+            - Points should be presentation-friendly and readable
+            - Speaker notes should provide additional context
+            - All content must come from the transcript
+        """
 
-    def analyze_transcript(self, transcript: str) -> list[dict]:
-        print("Creating outline...")
-        outline = self._create_outline(transcript)
+        prompt = self._build_messages(instructions, transcript)
+        retry_prompt = self._build_messages(
+            instructions + "\nPrevious attempt was incomplete. Please ensure all required sections are included.",
+            transcript
+        )
+        response_text = self.router.run(
+            'section', 'anthropic', prompt, self._invoke,
+            validate=lambda text: self._validate_slide_content(self._parse_slide_content(text)),
+            retry_prompt=retry_prompt
+        )
+        return self._parse_slide_content(response_text)
+
+    def _extract_detailed_content(self, sections: list[dict], transcript: str = None) -> list[dict]:
+        return [self.expand_section(section, transcript) for section in sections]
+
+    def analyze_transcript(self, transcript: str, chapters: list[dict] = None,
+                           segments: list[dict] = None) -> list[dict]:
+        outline = self.build_outline(transcript, chapters, segments)
 
         # print("Generated Outline:")
         # for section in outline:
@@ -152,8 +345,12 @@ class ContentAnalyzer:
         #     print("=" * 50)
         
         print("Extracting detailed content...")
-        slides = self._extract_detailed_content(outline)
+        slides = self._extract_detailed_content(outline, transcript)
 
+        self.print_slides(slides)
+        return slides
+
+    def print_slides(self, slides: list[dict]):
         print("\nGenerated Slides Content:")
         print("=" * 50)
         for i, slide in enumerate(slides, 1):
@@ -164,6 +361,4 @@ class ContentAnalyzer:
             print("\nSpeaker Notes:")
             for note in slide['speaker_notes']:
                 print(f"→ {note}")
-            print("=" * 50)
-        
-        return slides
\ No newline at end of file
+            print("=" * 50)
\ No newline at end of file
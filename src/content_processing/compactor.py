@@ -0,0 +1,169 @@
+import hashlib
+import math
+import re
+import tiktoken
+
+# Case-sensitive on purpose: "Um"/"uh" are fillers, "HM Treasury" or "UM" are not;
+# never part of a hyphenated word, so "Uh-huh" stays whole
+FILLER_PATTERN = re.compile(r"(?:,\s*)?(?<![\w-])(?:[Uu]m+|[Uu]h+|[Ee]rm+|[Aa]h+|[Hh]m+|mm+)(?![\w-])[,.]?")
+# Hedges only at a sentence start or comma-delimited on both sides, so "I'd like, maybe"
+# keeps its verb and "Do you know, what..." keeps its question
+HEDGE_PATTERN = re.compile(
+    r"(?:^\s*|(?<=[.!?]\s))(?:you know|i mean),\s*|,\s*\b(?:you know|i mean|like)(?=,)",
+    re.IGNORECASE
+)
+# A false start repeats its fragment ("I- I", "wh- what"); "pre- and post-" and ranges
+# like "20- 200" are left alone
+FALSE_START_PATTERN = re.compile(r"\b([^\W\d]+)-\s+(?=\1)", re.IGNORECASE)
+# Stutters only: numbers ("the 10 10 rule") and grammatical doubles ("that that") are kept
+REPEATED_WORD_PATTERN = re.compile(r"\b(?!(?:that|had|is)\b)([^\W\d]+)(?:[\s,]+\1\b)+", re.IGNORECASE)
+
+# Whole sentences that only acknowledge the speaker; answers ("No.", "Yes.") aren't listed
+BACKCHANNEL_PATTERN = re.compile(
+    r"(?:(?:okay|ok|alright|all right|yeah|right|sure|cool|great|mhm|mm-hmm|uh-huh|oh|so|well)[\s,.!]*)+",
+    re.IGNORECASE
+)
+
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+SPONSOR_PATTERN = re.compile(
+    r"sponsored by|brought to you by|for sponsoring|promo code|use (?:the )?code \w+|"
+    r"link (?:is )?in the description|subscribe to (?:the|my|our) channel|"
+    r"hit the (?:like|bell)|smash (?:that|the) like",
+    re.IGNORECASE
+)
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can do does for from had has have he her his i if in
+into is it its just me my of on or our she so that the their them then there
+these they this to too us was we were what when which who will with would you your
+okay ok yeah right alright well oh
+""".split())
+
+
+class TranscriptCompactor:
+    def __init__(self, token_budget: int = None, similarity_threshold: float = 0.8,
+                 shingle_size: int = 3, drop_sponsors: bool = True, count_tokens=None):
+        """
+        Deterministic, local transcript clean-up run before the LLM sees the text.
+        `token_budget` (optional) drops the lowest-information sentences until the
+        transcript fits; `similarity_threshold` is the shingle Jaccard score above
+        which a sentence counts as a repeat of an earlier one.
+        """
+        self.token_budget = token_budget
+        self.similarity_threshold = similarity_threshold
+        self.shingle_size = shingle_size
+        self.drop_sponsors = drop_sponsors
+        if count_tokens is None:
+            encoding = tiktoken.get_encoding("cl100k_base")
+            count_tokens = lambda text: len(encoding.encode(text, disallowed_special=()))
+        self.count_tokens = count_tokens
+
+    def remove_disfluencies(self, text: str) -> str:
+        text = FILLER_PATTERN.sub("", text)
+        text = HEDGE_PATTERN.sub("", text)
+        text = FALSE_START_PATTERN.sub("", text)
+        text = REPEATED_WORD_PATTERN.sub(r"\1", text)
+        text = re.sub(r"\s+([,.!?])", r"\1", text)
+        text = re.sub(r"([,.!?])[,]+", r"\1", text)
+        text = re.sub(r"\s+", " ", text).strip(" ,")
+        return text[:1].upper() + text[1:]
+
+    def _words(self, sentence: str) -> list[str]:
+        return re.findall(r"\w+", sentence.lower())
+
+    def _shingles(self, words: list[str]) -> set[int]:
+        k = self.shingle_size
+        grams = [' '.join(words[i:i + k]) for i in range(max(1, len(words) - k + 1))]
+        return {int(hashlib.md5(gram.encode()).hexdigest()[:12], 16) for gram in grams}
+
+    def _is_noise(self, sentence: str, previous: str = "") -> bool:
+        """Empty after clean-up, a backchannel ("Okay.", "Yeah, right.") or a sponsor read."""
+        if not self._words(sentence):
+            return True
+        # After a question even "Sure." or "Yeah." is the answer
+        if BACKCHANNEL_PATTERN.fullmatch(sentence.strip()) and not previous.rstrip().endswith('?'):
+            return True
+        return self.drop_sponsors and bool(SPONSOR_PATTERN.search(sentence))
+
+    def _drop_noise(self, texts: list[str]) -> list[int]:
+        """Return the indices of texts that aren't noise, judging each against the one before it."""
+        return [i for i, text in enumerate(texts)
+                if not self._is_noise(text, texts[i - 1] if i else "")]
+
+    def deduplicate(self, sentences: list[str]) -> list[int]:
+        """Return the indices of sentences to keep, dropping near-duplicates of earlier ones."""
+        kept = []
+        kept_shingles = []
+        index = {}  # shingle hash -> positions in kept_shingles that contain it
+
+        for i, sentence in enumerate(sentences):
+            shingles = self._shingles(self._words(sentence))
+            candidates = {pos for shingle in shingles for pos in index.get(shingle, ())}
+            is_duplicate = any(
+                len(shingles & kept_shingles[pos]) / len(shingles | kept_shingles[pos])
+                >= self.similarity_threshold
+                for pos in candidates
+            )
+            if is_duplicate:
+                continue
+
+            for shingle in shingles:
+                index.setdefault(shingle, []).append(len(kept_shingles))
+            kept_shingles.append(shingles)
+            kept.append(i)
+
+        return kept
+
+    def _information_scores(self, sentences: list[str]) -> list[float]:
+        """IDF-weighted density of content words; low scores are chit-chat and recap."""
+        word_sets = [{w for w in self._words(s) if w not in STOPWORDS} for s in sentences]
+        doc_freq = {}
+        for words in word_sets:
+            for word in words:
+                doc_freq[word] = doc_freq.get(word, 0) + 1
+
+        n = len(sentences)
+        scores = []
+        for sentence, words in zip(sentences, word_sets):
+            weight = sum(math.log((n + 1) / doc_freq[w]) for w in words)
+            scores.append(weight / math.sqrt(len(self._words(sentence)) or 1))
+        return scores
+
+    def _fit_budget(self, sentences: list[str]) -> list[str]:
+        token_counts = [self.count_tokens(s) for s in sentences]
+        total = sum(token_counts)
+        if self.token_budget is None or total <= self.token_budget:
+            return sentences
+
+        dropped = set()
+        scores = self._information_scores(sentences)
+        for i in sorted(range(len(sentences)), key=lambda i: scores[i]):
+            if total <= self.token_budget:
+                break
+            dropped.add(i)
+            total -= token_counts[i]
+        return [s for i, s in enumerate(sentences) if i not in dropped]
+
+    def compact(self, text: str) -> tuple[str, dict]:
+        """Return the compacted transcript and {'tokens_before', 'tokens_after', 'sentences_before', 'sentences_after'}."""
+        sentences = [self.remove_disfluencies(s) for s in SENTENCE_PATTERN.split(text)]
+        sentences_before = len(sentences)
+        sentences = [sentences[i] for i in self._drop_noise(sentences)]
+        sentences = [sentences[i] for i in self.deduplicate(sentences)]
+        sentences = self._fit_budget(sentences)
+        compacted = ' '.join(sentences)
+
+        stats = {
+            'tokens_before': self.count_tokens(text),
+            'tokens_after': self.count_tokens(compacted),
+            'sentences_before': sentences_before,
+            'sentences_after': len(sentences),
+        }
+        return compacted, stats
+
+    def compact_segments(self, segments: list[dict]) -> list[dict]:
+        """Clean timestamped segments in place of the text, keeping their timing; no budget is applied."""
+        cleaned = [{**seg, 'text': self.remove_disfluencies(seg['text'])} for seg in segments]
+        cleaned = [cleaned[i] for i in self._drop_noise([seg['text'] for seg in cleaned])]
+        return [cleaned[i] for i in self.deduplicate([seg['text'] for seg in cleaned])]
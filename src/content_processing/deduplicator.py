@@ -0,0 +1,92 @@
+import re
+import zlib
+import numpy as np
+from .compactor import STOPWORDS
+
+
+# Transcript window size (in words) used to estimate where a section's material sits
+LOCATE_WINDOW_WORDS = 150
+
+
+class SectionDeduplicator:
+    def __init__(self, similarity_threshold: float = 0.5, n_features: int = 2 ** 12):
+        """
+        Merges outline sections that cover the same ground before each one
+        costs an expansion call. Sections are embedded as TF-IDF weighted,
+        hashed vectors of stemmed words and compared with one cosine matrix.
+        Bigrams are left out on purpose: paraphrased sections rarely share them,
+        so they only pull duplicates apart.
+        """
+        self.similarity_threshold = similarity_threshold
+        self.n_features = n_features
+
+    @staticmethod
+    def _stem(word: str) -> str:
+        """Light suffix stripping so "networks"/"network" and "training"/"trained" match."""
+        for suffix, replacement in (('ies', 'y'), ('sses', 'ss'), ('xes', 'x'), ('ches', 'ch'),
+                                    ('shes', 'sh'), ('ing', ''), ('ed', ''), ('s', '')):
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                if suffix == 's' and word.endswith(('ss', 'us', 'is')):
+                    return word
+                return word[:-len(suffix)] + replacement
+        return word
+
+    def _terms(self, section: dict) -> list[str]:
+        text = ' '.join([section['title']] + section['key_points'])
+        return [self._stem(w) for w in re.findall(r"\w+", text.lower()) if w not in STOPWORDS]
+
+    def vectorize(self, sections: list[dict]) -> np.ndarray:
+        counts = np.zeros((len(sections), self.n_features))
+        for row, section in enumerate(sections):
+            for term in self._terms(section):
+                # crc32 rather than hash() so buckets are stable across runs
+                counts[row, zlib.crc32(term.encode()) % self.n_features] += 1
+
+        doc_freq = np.count_nonzero(counts, axis=0)
+        idf = np.log((1 + len(sections)) / (1 + doc_freq)) + 1
+        vectors = counts * idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def similarity_matrix(self, sections: list[dict]) -> np.ndarray:
+        vectors = self.vectorize(sections)
+        return vectors @ vectors.T
+
+    def locate(self, sections: list[dict], transcript: str) -> list[int]:
+        """Index of the transcript window each section matches best, as a proxy for its position."""
+        words = transcript.split()
+        windows = [
+            {'title': '', 'key_points': [' '.join(words[i:i + LOCATE_WINDOW_WORDS])]}
+            for i in range(0, len(words), LOCATE_WINDOW_WORDS)
+        ]
+        if not windows:
+            return [0] * len(sections)
+        vectors = self.vectorize(sections + windows)
+        similarity = vectors[:len(sections)] @ vectors[len(sections):].T
+        return [int(i) for i in similarity.argmax(axis=1)]
+
+    def deduplicate(self, sections: list[dict], keep: int = 0) -> list[dict]:
+        """
+        Fold each section into the first earlier kept section it's too similar
+        to. The first `keep` sections are never folded away, so they come back
+        first and in order.
+        """
+        if len(sections) < 2:
+            return list(sections)
+
+        similarity = self.similarity_matrix(sections)
+        kept = []
+        merged = {}  # kept index -> merged section
+        for i, section in enumerate(sections):
+            match = None if i < keep else next(
+                (k for k in kept if similarity[i, k] >= self.similarity_threshold), None)
+            if match is None:
+                kept.append(i)
+                merged[i] = {**section, 'key_points': list(section['key_points'])}
+                continue
+
+            print(f"Merging duplicate section '{section['title']}' into '{merged[match]['title']}'")
+            seen = {point.lower() for point in merged[match]['key_points']}
+            merged[match]['key_points'] += [p for p in section['key_points'] if p.lower() not in seen]
+
+        return [merged[k] for k in kept]
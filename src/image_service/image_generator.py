@@ -3,14 +3,31 @@ import requests
 from PIL import Image
 from io import BytesIO
 import os
+from src.model_routing import ModelRouter
 
 class ImageGenerator:
-    def __init__(self, api_key: str, output_dir: str = "temp_images"):
+    def __init__(self, api_key: str, output_dir: str = "temp_images", router: ModelRouter = None):
         self.client = OpenAI(api_key=api_key)
+        self.router = router or ModelRouter()
         self.output_dir = output_dir
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
+    def _invoke(self, model: str, prompt: str) -> tuple[str, dict]:
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        usage = {'input_tokens': response.usage.prompt_tokens} if response.usage else {}
+        return response.choices[0].message.content.strip(), usage
+
+    @staticmethod
+    def _is_score(text: str) -> bool:
+        try:
+            float(text)
+            return True
+        except ValueError:
+            return False
 
     def analyze_slide_worthiness(self, slide_content: dict) -> float:
         prompt = f"""
@@ -24,11 +41,9 @@ class ImageGenerator:
         Return only the numerical score.
         """
         
-        response = self.client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return float(response.choices[0].message.content.strip())
+        score = self.router.run('worthiness', 'openai', prompt, self._invoke, validate=self._is_score)
+        # Every tier may still answer with prose; don't let one slide abort the run
+        return float(score) if self._is_score(score) else 0.0
     
 
     def generate_image_prompt(self, slide_content: dict) -> str:
@@ -55,11 +70,7 @@ class ImageGenerator:
             Return only the DALL-E prompt.
             """
         
-        response = self.client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return response.choices[0].message.content.strip()
+        return self.router.run('image_prompt', 'openai', prompt, self._invoke, validate=bool)
     
 
     def generate_and_save_image(self, prompt: str, index: int) -> str:
@@ -0,0 +1,3 @@
+from .router import ModelRouter
+
+__all__ = ['ModelRouter']
@@ -0,0 +1,190 @@
+import threading
+import time
+import tiktoken
+
+# Tiers are ordered from cheapest/fastest to largest; escalation walks this list.
+TIER_ORDER = ['small', 'medium', 'large']
+
+DEFAULT_TIERS = {
+    'anthropic': {
+        'small': 'claude-3-haiku-20240307',
+        'medium': 'claude-3-5-sonnet-20241022',
+        'large': 'claude-3-opus-20240229',
+    },
+    'openai': {
+        'small': 'gpt-4o-mini',
+        'medium': 'gpt-4o',
+        'large': 'gpt-4-turbo-preview',
+    },
+}
+
+# Starting tier for each call type before input size is taken into account
+DEFAULT_ROUTES = {
+    'outline': 'large',
+    'section': 'medium',
+    'retry': 'large',
+    'worthiness': 'small',
+    'image_prompt': 'small',
+}
+
+# Largest prompt (in tokens) a tier is trusted with before moving up a tier
+DEFAULT_TOKEN_LIMITS = {
+    'small': 4000,
+    'medium': 50000,
+}
+
+# Provider prompt-cache pricing relative to the normal input price
+CACHE_READ_MULTIPLIER = 0.1
+CACHE_WRITE_MULTIPLIER = 1.25
+
+# USD per million (input, output) tokens
+DEFAULT_PRICES = {
+    'claude-3-haiku-20240307': (0.25, 1.25),
+    'claude-3-5-sonnet-20241022': (3.0, 15.0),
+    'claude-3-opus-20240229': (15.0, 75.0),
+    'gpt-4o-mini': (0.15, 0.6),
+    'gpt-4o': (2.5, 10.0),
+    'gpt-4-turbo-preview': (10.0, 30.0),
+}
+
+
+class ModelRouter:
+    def __init__(self, tiers: dict = None, routes: dict = None,
+                 token_limits: dict = None, prices: dict = None):
+        # Merge per provider so overriding one provider's tiers keeps the others
+        self.tiers = {
+            provider: {**DEFAULT_TIERS.get(provider, {}), **(tiers or {}).get(provider, {})}
+            for provider in {*DEFAULT_TIERS, *(tiers or {})}
+        }
+        self.routes = {**DEFAULT_ROUTES, **(routes or {})}
+        self.token_limits = {**DEFAULT_TOKEN_LIMITS, **(token_limits or {})}
+        self.prices = {**DEFAULT_PRICES, **(prices or {})}
+        self.encoding = tiktoken.get_encoding("cl100k_base")
+        self.stats = {}
+        self.cache_stats = {'read_tokens': 0, 'written_tokens': 0}
+        self._lock = threading.Lock()  # calls may be issued from pipeline worker threads
+
+    def count_tokens(self, text: str) -> int:
+        """Approximate token count using a local tokenizer (no API round trip)."""
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def _prompt_text(self, prompt) -> str:
+        """Flatten a plain string or a list of chat messages (str or content-block content) to text."""
+        if isinstance(prompt, str):
+            return prompt
+        parts = []
+        for message in prompt:
+            content = getattr(message, 'content', message)
+            if isinstance(content, str):
+                parts.append(content)
+            else:
+                parts.extend(block.get('text', '') for block in content if isinstance(block, dict))
+        return '\n'.join(parts)
+
+    def next_tier(self, tier: str) -> str | None:
+        index = TIER_ORDER.index(tier)
+        return TIER_ORDER[index + 1] if index + 1 < len(TIER_ORDER) else None
+
+    def _max_tier(self, a: str, b: str) -> str:
+        return a if TIER_ORDER.index(a) >= TIER_ORDER.index(b) else b
+
+    def select_tier(self, call_type: str, input_tokens: int) -> str:
+        """Pick the routed tier for a call type, bumped up while the input is too large for it."""
+        tier = self.routes[call_type]
+        # Stop at the largest tier even if a limit is configured for it
+        while (tier in self.token_limits and input_tokens > self.token_limits[tier]
+               and self.next_tier(tier) is not None):
+            tier = self.next_tier(tier)
+        return tier
+
+    def model_for(self, provider: str, tier: str) -> str:
+        return self.tiers[provider][tier]
+
+    def run(self, call_type: str, provider: str, prompt, call,
+            validate=None, retry_prompt=None) -> str:
+        """
+        Run `call(model, prompt)` on the tier routed for `call_type`. `call`
+        returns `(text, usage)`, where usage may carry provider-reported
+        'input_tokens', 'cache_read_tokens' and 'cache_write_tokens'.
+        If `validate` rejects the output, retry once per tier on successively
+        larger models (never below the 'retry' route) until it passes or the
+        largest tier has been tried.
+        """
+        input_tokens = self.count_tokens(self._prompt_text(prompt))
+        tier = self.select_tier(call_type, input_tokens)
+
+        while True:
+            model = self.model_for(provider, tier)
+            start = time.perf_counter()
+            text, usage = call(model, prompt)
+            self._record(provider, tier, model, time.perf_counter() - start,
+                         input_tokens, self.count_tokens(text), usage)
+
+            if validate is None or validate(text):
+                return text
+
+            escalated = self.next_tier(tier)
+            if escalated is None:
+                print(f"Output for '{call_type}' failed validation on largest tier, keeping last response")
+                return text
+
+            tier = self._max_tier(escalated, self.routes['retry'])
+            print(f"Output for '{call_type}' failed validation, escalating to {tier} tier")
+            if retry_prompt is not None:
+                prompt = retry_prompt
+                input_tokens = self.count_tokens(self._prompt_text(prompt))
+
+    def _record(self, provider: str, tier: str, model: str, latency: float,
+                input_tokens: int, output_tokens: int, usage: dict):
+        cache_read = usage.get('cache_read_tokens', 0)
+        cache_write = usage.get('cache_write_tokens', 0)
+        # Anthropic's input_tokens already excludes cached tokens; otherwise use the local estimate
+        uncached = usage.get('input_tokens', max(input_tokens - cache_read - cache_write, 0))
+
+        input_price, output_price = self.prices.get(model, (0.0, 0.0))
+        cost = (
+            uncached * input_price
+            + cache_read * input_price * CACHE_READ_MULTIPLIER
+            + cache_write * input_price * CACHE_WRITE_MULTIPLIER
+            + output_tokens * output_price
+        ) / 1_000_000
+
+        with self._lock:
+            # Keyed per provider so e.g. sonnet and gpt-4o aren't averaged together
+            stats = self.stats.setdefault((provider, tier), {
+                'model': model,
+                'calls': 0,
+                'latency_s': 0.0,
+                'input_tokens': 0,
+                'output_tokens': 0,
+                'cache_read_tokens': 0,
+                'cache_write_tokens': 0,
+                'cost_usd': 0.0,
+            })
+            stats['calls'] += 1
+            stats['latency_s'] += latency
+            stats['input_tokens'] += uncached + cache_read + cache_write
+            stats['output_tokens'] += output_tokens
+            stats['cache_read_tokens'] += cache_read
+            stats['cache_write_tokens'] += cache_write
+            stats['cost_usd'] += cost
+            self.cache_stats['read_tokens'] += cache_read
+            self.cache_stats['written_tokens'] += cache_write
+
+    def report(self) -> str:
+        lines = ["Model usage by tier:"]
+        ordered = sorted(self.stats, key=lambda key: (key[0], TIER_ORDER.index(key[1])))
+        for provider, tier in ordered:
+            s = self.stats[(provider, tier)]
+            lines.append(
+                f"  {provider + '/' + tier:<16} {s['model']:<28} calls={s['calls']:<3} "
+                f"avg_latency={s['latency_s'] / s['calls']:.2f}s "
+                f"tokens={s['input_tokens']}in/{s['output_tokens']}out "
+                f"cache={s['cache_read_tokens']}read/{s['cache_write_tokens']}written "
+                f"cost=${s['cost_usd']:.4f}"
+            )
+        lines.append(
+            f"Prompt cache: {self.cache_stats['read_tokens']} tokens read, "
+            f"{self.cache_stats['written_tokens']} tokens written"
+        )
+        return "\n".join(lines)
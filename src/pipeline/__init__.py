@@ -0,0 +1,5 @@
+from .executor import Pipeline, PipelineCancelled, Stage
+from .presentation import build_presentation_pipeline, extract_youtube_title
+
+__all__ = ['Pipeline', 'PipelineCancelled', 'Stage',
+           'build_presentation_pipeline', 'extract_youtube_title']
@@ -0,0 +1,161 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import threading
+import time
+
+# How often the scheduler wakes up to notice cancellation while stages run
+POLL_INTERVAL = 0.5
+
+# Marks a stage with no on_timeout value, since None is a legitimate fallback
+NO_FALLBACK = object()
+
+
+class PipelineCancelled(Exception):
+    pass
+
+
+class Stage:
+    def __init__(self, name: str, func, inputs: tuple = (), outputs: tuple = None,
+                 timeout: float = None, on_timeout=NO_FALLBACK):
+        """
+        A unit of work in the pipeline. `func` is called with the resolved
+        `inputs` as keyword arguments. Its return value is published under
+        `outputs` (defaults to the stage name); with several outputs, `func`
+        must return a tuple of the same length.
+
+        `timeout` is measured from when the stage starts running. If the stage
+        declares `on_timeout`, that value is published instead and the run
+        carries on; otherwise a timeout fails the run.
+        """
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs) if outputs else (name,)
+        self.timeout = timeout
+        self.on_timeout = on_timeout
+
+
+class Pipeline:
+    def __init__(self, max_workers: int = 4):
+        self.stages = {}
+        self.max_workers = max_workers
+        self._cancel_event = threading.Event()
+
+    def add_stage(self, name: str, func, inputs: tuple = (), outputs: tuple = None,
+                  timeout: float = None, on_timeout=NO_FALLBACK) -> Stage:
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        stage = Stage(name, func, inputs, outputs, timeout, on_timeout)
+        self.stages[name] = stage
+        return stage
+
+    def cancel(self):
+        """Stop scheduling new stages; the current `run` raises PipelineCancelled."""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Called by stages between paid calls; worker threads can't be interrupted otherwise."""
+        if self._cancel_event.is_set():
+            raise PipelineCancelled("Pipeline cancelled")
+
+    def _validate(self, initial: dict):
+        available = set(initial)
+        for stage in self.stages.values():
+            available.update(stage.outputs)
+        for stage in self.stages.values():
+            missing = [i for i in stage.inputs if i not in available]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' has unresolvable inputs: {missing}")
+
+    def _publish(self, values: dict, stage: Stage, result):
+        if len(stage.outputs) == 1:
+            values[stage.outputs[0]] = result
+        else:
+            values.update(zip(stage.outputs, result))
+
+    def run(self, initial: dict = None, on_stage_complete=None, on_poll=None) -> dict:
+        """
+        Run every stage as soon as its inputs are available and return all
+        produced values. `on_stage_complete(name, done, total)` is called from
+        the calling thread after each stage finishes, and `on_poll()` on every
+        scheduler wake-up (a hook for UIs that can only interrupt the calling thread).
+        """
+        self._cancel_event.clear()
+        values = dict(initial or {})
+        self._validate(values)
+
+        pending = dict(self.stages)
+        running = {}  # future -> stage
+        started = {}  # stage name -> monotonic time the worker actually began
+        total = len(pending)
+        done_count = 0
+        abandoned = False
+
+        def timed(stage, kwargs):
+            started[stage.name] = time.monotonic()
+            return stage.func(**kwargs)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while pending or running:
+                if self._cancel_event.is_set():
+                    raise PipelineCancelled("Pipeline cancelled")
+
+                for name, stage in list(pending.items()):
+                    if all(i in values for i in stage.inputs):
+                        kwargs = {i: values[i] for i in stage.inputs}
+                        running[executor.submit(timed, stage, kwargs)] = stage
+                        del pending[name]
+
+                if not running:
+                    raise RuntimeError(f"Pipeline stalled with stages pending: {list(pending)}")
+
+                now = time.monotonic()
+                deadlines = [started[stage.name] + stage.timeout - now
+                             for stage in running.values()
+                             if stage.timeout is not None and stage.name in started]
+                wait_for = max(0.0, min(deadlines + [POLL_INTERVAL]))
+
+                finished, _ = wait(list(running), timeout=wait_for, return_when=FIRST_COMPLETED)
+                if on_poll:
+                    on_poll()
+
+                completed = []
+                for future in finished:
+                    stage = running.pop(future)
+                    self._publish(values, stage, future.result())
+                    completed.append(stage)
+
+                now = time.monotonic()
+                for future, stage in list(running.items()):
+                    if stage.timeout is None or stage.name not in started:
+                        continue
+                    if now - started[stage.name] <= stage.timeout:
+                        continue
+                    if stage.on_timeout is NO_FALLBACK:
+                        raise TimeoutError(f"Stage '{stage.name}' timed out after {stage.timeout}s")
+                    # The worker thread can't be killed; leave it to finish and ignore its result
+                    print(f"Stage '{stage.name}' timed out after {stage.timeout}s, using fallback")
+                    future.cancel()
+                    del running[future]
+                    abandoned = True
+                    self._publish(values, stage, stage.on_timeout)
+                    completed.append(stage)
+
+                for stage in completed:
+                    done_count += 1
+                    if on_stage_complete:
+                        on_stage_complete(stage.name, done_count, total)
+        except BaseException:
+            # Also covers a UI stopping the calling thread (e.g. Streamlit's StopException
+            # from on_poll): flag still-running stages so they skip their remaining calls
+            self._cancel_event.set()
+            raise
+        finally:
+            # Don't block on abandoned stages after a failure, timeout or cancel
+            executor.shutdown(wait=not (running or abandoned), cancel_futures=True)
+
+        return values
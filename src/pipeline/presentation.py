@@ -0,0 +1,164 @@
+import json
+import os
+import pickle
+import urllib.request
+from .executor import Pipeline
+
+DEFAULT_TITLE = "YouTube Video Summary"
+
+
+def extract_youtube_title(url: str, timeout: float = 10) -> str | None:
+    """Extract the title of a YouTube video from its URL via oEmbed."""
+    try:
+        video_id = None
+        if "v=" in url:
+            video_id = url.split("v=")[1].split("&")[0]
+        elif "youtu.be/" in url:
+            video_id = url.split("youtu.be/")[1].split("?")[0]
+
+        if not video_id:
+            return None
+
+        url = f"https://www.youtube.com/oembed?url=http://www.youtube.com/watch?v={video_id}"
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            data = json.loads(response.read().decode())
+            return data['title']
+    except Exception as e:
+        print(f"Could not extract title: {e}")
+        return None
+
+
+def build_presentation_pipeline(service, analyzer, image_generator, slide_generator,
+                                num_slides: int, num_images: int,
+                                transcript_backup: str = "transcript.pkl",
+                                max_workers: int = 4, compactor=None,
+                                fidelity_check=None, min_fidelity: float = 0.8) -> Pipeline:
+    """
+    Build the YouTube -> PowerPoint DAG. Expects `youtube_url` and
+    `output_filename` as initial values when run.
+
+    If a `compactor` (TranscriptCompactor) is given, the transcript and its
+    segments are compacted before the outline stage. `fidelity_check(original,
+    compacted)` (e.g. eval.calculate_similarity) is reported alongside the
+    token savings; below `min_fidelity` the uncompacted transcript is used.
+
+    Each slide is expanded and scored in its own stage, so scoring of early
+    slides overlaps with expansion of later ones. The title and chapters come
+    from the yt-dlp metadata, so chaptered videos skip the outline LLM call.
+    """
+    pipeline = Pipeline(max_workers=max_workers)
+
+    def video(youtube_url):
+        try:
+            result = service.transcribe_youtube_video_with_metadata(url=youtube_url, language="en")
+            with open(transcript_backup, "wb") as f:
+                pickle.dump(result['text'], f)
+            return result['text'], result['segments'], result['metadata']
+        except Exception as e:
+            print(f"Error getting transcript: {e}")
+            print("Attempting to load from backup...")
+            with open(transcript_backup, "rb") as f:
+                return pickle.load(f), [], {}
+
+    def title(youtube_url, metadata):
+        # yt-dlp already has the title; oEmbed is only a fallback for the backup path
+        return metadata.get('title') or extract_youtube_title(youtube_url) or DEFAULT_TITLE
+
+    def compact(transcript, segments):
+        if compactor is None:
+            return transcript, segments
+        compacted, stats = compactor.compact(transcript)
+        print(f"Compacted transcript: {stats['tokens_before']} -> {stats['tokens_after']} tokens "
+              f"({stats['sentences_before']} -> {stats['sentences_after']} sentences)")
+        if fidelity_check is not None:
+            similarity = fidelity_check(transcript, compacted)
+            print(f"Compaction content similarity: {similarity:.2f}")
+            if similarity < min_fidelity:
+                print(f"Warning: similarity below {min_fidelity:.2f}, using the uncompacted transcript")
+                return transcript, segments
+        return compacted, compactor.compact_segments(segments)
+
+    def outline(compact_transcript, compact_segments, metadata):
+        return analyzer.build_outline(compact_transcript, metadata.get('chapters'), compact_segments)
+
+    pipeline.add_stage('video', video, inputs=('youtube_url',),
+                       outputs=('transcript', 'segments', 'metadata'))
+    # urlopen's timeout doesn't cover DNS, so bound the stage itself; the title is optional
+    pipeline.add_stage('title', title, inputs=('youtube_url', 'metadata'),
+                       timeout=15, on_timeout=DEFAULT_TITLE)
+    pipeline.add_stage('compact', compact, inputs=('transcript', 'segments'),
+                       outputs=('compact_transcript', 'compact_segments'))
+    pipeline.add_stage('outline', outline,
+                       inputs=('compact_transcript', 'compact_segments', 'metadata'))
+
+    def warm_cache(outline, compact_transcript):
+        # When sections share the cached transcript prefix, expand the first one alone so
+        # it writes the cache before the rest fan out; chapter sections have nothing to warm
+        if outline and analyzer.uses_shared_prefix(outline[0]):
+            pipeline.check_cancelled()
+            return analyzer.expand_section(outline[0], compact_transcript)
+        return None
+    pipeline.add_stage('warm_cache', warm_cache, inputs=('outline', 'compact_transcript'))
+
+    # The outline is asked for exactly num_slides sections; slots it doesn't fill stay None
+    slide_names = [f'slide_{i}' for i in range(num_slides)]
+    for i, name in enumerate(slide_names):
+        def expand(outline, compact_transcript, warm_cache, i=i):
+            if i >= len(outline):
+                return None
+            if i == 0 and warm_cache is not None:
+                return warm_cache
+            pipeline.check_cancelled()
+            return analyzer.expand_section(outline[i], compact_transcript)
+        pipeline.add_stage(name, expand, inputs=('outline', 'compact_transcript', 'warm_cache'))
+
+    image_names = []
+    if num_images > 0:
+        score_names = [f'score_{i}' for i in range(num_slides)]
+        for slide_name, score_name in zip(slide_names, score_names):
+            def score(slide_name=slide_name, **inputs):
+                slide = inputs[slide_name]
+                pipeline.check_cancelled()
+                return image_generator.analyze_slide_worthiness(slide) if slide else None
+            pipeline.add_stage(score_name, score, inputs=(slide_name,))
+
+        def top_slides(**scores):
+            ranked = [(i, scores[name]) for i, name in enumerate(score_names)
+                      if scores[name] is not None]
+            return sorted(ranked, key=lambda x: x[1], reverse=True)[:num_images]
+        pipeline.add_stage('top_slides', top_slides, inputs=tuple(score_names))
+
+        image_names = [f'image_{k}' for k in range(num_images)]
+        for k, image_name in enumerate(image_names):
+            def image(top_slides, k=k, **slides):
+                if k >= len(top_slides):
+                    return None
+                slide_index = top_slides[k][0]
+                slide = slides[slide_names[slide_index]]
+                pipeline.check_cancelled()
+                prompt = image_generator.generate_image_prompt(slide)
+                pipeline.check_cancelled()
+                image_path = image_generator.generate_and_save_image(prompt, slide_index)
+                print(f"Generated image for slide {slide_index + 1}")
+                return slide_index, image_path
+            pipeline.add_stage(image_name, image, inputs=('top_slides', *slide_names))
+
+    def deck(title, output_filename, **results):
+        slides = [results[name] for name in slide_names]
+        for name in image_names:
+            if results[name] is not None:
+                slide_index, image_path = results[name]
+                slides[slide_index]['image_path'] = image_path
+        slides = [slide for slide in slides if slide is not None]
+        analyzer.print_slides(slides)
+
+        slide_generator.generate_presentation(
+            slides_content=slides,
+            output_path=output_filename,
+            presentation_title=title
+        )
+        return output_filename
+    pipeline.add_stage('deck', deck,
+                       inputs=('title', 'output_filename', *slide_names, *image_names))
+
+    return pipeline
@@ -1,22 +1,56 @@
 from .transcriber import Transcriber
 from .youtube_loader import YouTubeLoader
+from .audio_conditioner import AudioConditioner
 import os
 
 class VideoTranscriptionService:
-    def __init__(self, api_key: str, output_dir: str = "temp"):
+    def __init__(self, api_key: str, output_dir: str = "temp", conditioner: AudioConditioner = None):
         self.loader = YouTubeLoader(output_dir)
         self.transcriber = Transcriber(api_key)
+        self.conditioner = conditioner
+        self.output_dir = output_dir
 
     def transcribe_youtube_video(self, url: str, language: str = "en") -> str:
+        return self.transcribe_youtube_video_with_metadata(url, language)['text']
+
+    def transcribe_youtube_video_with_metadata(self, url: str, language: str = "en") -> dict:
+        """Return {'text', 'segments', 'metadata'} where metadata is the loader's info dict."""
         print(f"Transcribing video from {url}")
-        audio_path = self.loader.download_and_convert(url)
+        metadata = self.loader.download_and_convert(url)
+        audio_path = metadata.pop('audio_path')
         print(f"Downloaded audio to {audio_path}")
+
+        conditioned = None
+        conditioned_path = os.path.join(self.output_dir, "audio_conditioned.mp3")
+        if self.conditioner is not None:
+            # Conditioning is only an optimisation; on failure send the original audio
+            try:
+                conditioned = self.conditioner.condition(audio_path, conditioned_path)
+            except Exception as e:
+                print(f"{e}; transcribing unconditioned audio")
+        if conditioned:
+            print(f"Conditioned audio: {conditioned['original_minutes']:.1f} -> "
+                  f"{conditioned['processed_minutes']:.1f} min "
+                  f"({conditioned['minutes_saved']:.1f} min saved)")
+
         print(f"Transcribing audio to text")
-        transcription = self.transcriber.transcribe(
-            audio_file_path=audio_path,
+        transcription = self.transcriber.transcribe_segments(
+            audio_file_path=conditioned['audio_path'] if conditioned else audio_path,
             language=language
         )
-        if os.path.exists(audio_path):
-            os.remove(audio_path)
+        for path in [audio_path, conditioned_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+        if conditioned:
+            # Map timestamps back onto the original video so chapter slicing still lines up
+            offset_map = conditioned['offset_map']
+            transcription['segments'] = [
+                {**seg,
+                 'start': self.conditioner.to_original_time(offset_map, seg['start']),
+                 'end': self.conditioner.to_original_time(offset_map, seg['end'])}
+                for seg in transcription['segments']
+            ]
+            metadata['audio_minutes_saved'] = conditioned['minutes_saved']
 
-        return transcription
\ No newline at end of file
+        return {**transcription, 'metadata': metadata}
\ No newline at end of file
@@ -0,0 +1,119 @@
+import subprocess
+import numpy as np
+
+# Whisper resamples everything to 16 kHz mono internally, so anything more is wasted upload
+WHISPER_SAMPLE_RATE = 16000
+
+# Frames per RMS block, so long recordings never get a full-length float copy
+RMS_CHUNK_FRAMES = 10000
+
+
+class AudioConditioner:
+    def __init__(self, tempo: float = 1.0, frame_ms: int = 30,
+                 silence_threshold_db: float = -35.0, min_silence: float = 0.6,
+                 padding: float = 0.15, ffmpeg_path: str = "ffmpeg"):
+        """
+        Shrinks audio before it's sent to Whisper: drops silences longer than
+        `min_silence` seconds (energy-based VAD, threshold relative to the
+        loud end of the recording), speeds it up by `tempo`, and downmixes to
+        16 kHz mono.
+        """
+        self.tempo = tempo
+        self.frame_ms = frame_ms
+        self.silence_threshold_db = silence_threshold_db
+        self.min_silence = min_silence
+        self.padding = padding
+        self.ffmpeg_path = ffmpeg_path
+
+    def detect_voice(self, samples: np.ndarray, sample_rate: int) -> list[tuple[int, int]]:
+        """Return (start, end) sample ranges that contain voice."""
+        frame_len = max(1, int(sample_rate * self.frame_ms / 1000))
+        n_frames = len(samples) // frame_len
+        if n_frames == 0:
+            return [(0, len(samples))] if len(samples) else []
+
+        frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len)
+        rms = np.empty(n_frames, dtype=np.float32)
+        for i in range(0, n_frames, RMS_CHUNK_FRAMES):
+            block = frames[i:i + RMS_CHUNK_FRAMES].astype(np.float32)
+            rms[i:i + RMS_CHUNK_FRAMES] = np.sqrt(np.mean(block * block, axis=1))
+        db = 20 * np.log10(np.maximum(rms, 1e-10))
+        voiced = db > np.percentile(db, 95) + self.silence_threshold_db
+
+        # Pad each voiced frame so word onsets/tails aren't clipped
+        pad = int(np.ceil(self.padding * 1000 / self.frame_ms))
+        if pad:
+            voiced = np.convolve(voiced, np.ones(2 * pad + 1), mode='same') > 0
+
+        regions = []
+        edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+        for start, end in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+            # A region reaching the last whole frame also keeps the trailing partial frame
+            start, end = int(start) * frame_len, (len(samples) if end == n_frames else int(end) * frame_len)
+            # Keep short pauses; only silences longer than min_silence are cut
+            if regions and start - regions[-1][1] < self.min_silence * sample_rate:
+                regions[-1] = (regions[-1][0], end)
+            else:
+                regions.append((start, end))
+        return regions
+
+    def build_offset_map(self, regions: list[tuple[int, int]], sample_rate: int) -> list[dict]:
+        """Map each kept region's position in the processed audio back to the original (seconds)."""
+        offset_map = []
+        position = 0.0
+        for start, end in regions:
+            duration = (end - start) / sample_rate / self.tempo
+            offset_map.append({
+                'start': position,
+                'end': position + duration,
+                'original_start': start / sample_rate,
+            })
+            position += duration
+        return offset_map
+
+    def to_original_time(self, offset_map: list[dict], t: float) -> float:
+        """Convert a timestamp in the processed audio to one in the original video."""
+        if not offset_map:
+            return t
+        region = next((r for r in offset_map if t < r['end']), offset_map[-1])
+        return region['original_start'] + (t - region['start']) * self.tempo
+
+    def _decode(self, audio_path: str) -> np.ndarray:
+        result = subprocess.run(
+            [self.ffmpeg_path, "-v", "error", "-i", audio_path,
+             "-ac", "1", "-ar", str(WHISPER_SAMPLE_RATE), "-f", "s16le", "-"],
+            capture_output=True, check=True
+        )
+        return np.frombuffer(result.stdout, dtype=np.int16)
+
+    def _encode(self, samples: np.ndarray, output_path: str):
+        command = [self.ffmpeg_path, "-v", "error", "-y",
+                   "-f", "s16le", "-ac", "1", "-ar", str(WHISPER_SAMPLE_RATE), "-i", "-"]
+        if self.tempo != 1.0:
+            command += ["-filter:a", f"atempo={self.tempo}"]
+        command += ["-ac", "1", "-ar", str(WHISPER_SAMPLE_RATE), "-b:a", "32k", output_path]
+        subprocess.run(command, input=samples.tobytes(), capture_output=True, check=True)
+
+    def condition(self, audio_path: str, output_path: str) -> dict:
+        """
+        Write the conditioned audio to `output_path`.
+        Returns {'audio_path', 'offset_map', 'original_minutes', 'processed_minutes', 'minutes_saved'}.
+        """
+        try:
+            samples = self._decode(audio_path)
+            regions = self.detect_voice(samples, WHISPER_SAMPLE_RATE)
+            voiced = np.concatenate([samples[start:end] for start, end in regions]) if regions else samples
+            self._encode(voiced, output_path)
+        except Exception as e:
+            raise Exception(f"Audio conditioning failed: {str(e)}")
+
+        offset_map = self.build_offset_map(regions, WHISPER_SAMPLE_RATE)
+        original_minutes = len(samples) / WHISPER_SAMPLE_RATE / 60
+        processed_minutes = len(voiced) / WHISPER_SAMPLE_RATE / self.tempo / 60
+        return {
+            'audio_path': output_path,
+            'offset_map': offset_map,
+            'original_minutes': original_minutes,
+            'processed_minutes': processed_minutes,
+            'minutes_saved': original_minutes - processed_minutes,
+        }
@@ -7,16 +7,29 @@ class Transcriber:
 
     def transcribe(self, audio_file_path: str, language: str = "en", 
                    model: str = "whisper-1", temperature: float = 0.0)-> str:
-        # transcribe the audio files using whisper
+        # plain text only; transcribe_segments does the actual request
+        return self.transcribe_segments(audio_file_path, language, model, temperature)['text']
+
+    def transcribe_segments(self, audio_file_path: str, language: str = "en",
+                            model: str = "whisper-1", temperature: float = 0.0) -> dict:
+        # transcribe the audio file using whisper, keeping segment timestamps so the text can be sliced by chapter
         try:
             with open(audio_file_path, "rb") as f:
                 transcription = self.client.audio.transcriptions.create(
                                     model=model, 
                                     language=language,
                                     temperature=temperature,
+                                    response_format="verbose_json",
+                                    timestamp_granularities=["segment"],
                                     file=f
                                 )
-                return transcription.text
+                return {
+                    'text': transcription.text,
+                    'segments': [
+                        {'start': seg.start, 'end': seg.end, 'text': seg.text}
+                        for seg in transcription.segments or []
+                    ],
+                }
 
         except Exception as e:
             raise Exception(f"Transcription failed: {str(e)}")
\ No newline at end of file
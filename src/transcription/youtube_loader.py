@@ -7,7 +7,11 @@ class YouTubeLoader:
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
-    def download_and_convert(self, url: str) -> str:
+    def download_and_convert(self, url: str) -> dict:
+        """
+        Download the audio track and return it with the video metadata:
+        {'audio_path', 'title', 'duration', 'chapters': [{'title', 'start_time', 'end_time'}]}
+        """
         try:
             temp_path = os.path.join(self.output_dir, "temp_audio")
             final_path = os.path.join(self.output_dir, "audio.mp3")
@@ -24,12 +28,24 @@ class YouTubeLoader:
             }
             
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
+                info = ydl.extract_info(url, download=True)
             
             if os.path.exists(temp_path + ".mp3"):
                 os.rename(temp_path + ".mp3", final_path)
             
-            return final_path
+            return {
+                'audio_path': final_path,
+                'title': info.get('title'),
+                'duration': info.get('duration'),
+                'chapters': [
+                    {
+                        'title': chapter['title'],
+                        'start_time': chapter['start_time'],
+                        'end_time': chapter['end_time'],
+                    }
+                    for chapter in info.get('chapters') or []
+                ],
+            }
 
         except Exception as e:
             raise Exception(f"Download failed: {str(e)}")
\ No newline at end of file
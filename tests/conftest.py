@@ -0,0 +1,14 @@
+import pytest
+import tiktoken
+
+
+class WhitespaceEncoding:
+    """Offline stand-in for tiktoken encodings: one token per whitespace-separated word."""
+
+    def encode(self, text, **kwargs):
+        return text.split()
+
+
+@pytest.fixture(autouse=True)
+def offline_tokenizer(monkeypatch):
+    monkeypatch.setattr(tiktoken, "get_encoding", lambda name: WhitespaceEncoding())
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+from src.transcription.audio_conditioner import AudioConditioner, WHISPER_SAMPLE_RATE
+
+SR = WHISPER_SAMPLE_RATE
+rng = np.random.default_rng(0)
+
+
+def tone(seconds):
+    t = np.arange(int(seconds * SR)) / SR
+    return (8000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def noise(seconds):
+    return rng.normal(0, 20, int(seconds * SR)).astype(np.int16)
+
+
+def speech_with_pauses():
+    # 2s lead-in, 3s speech, 0.3s pause (bridged), 1s speech, 4s gap (cut), 2s speech, 1s tail
+    return np.concatenate([noise(2), tone(3), noise(0.3), tone(1), noise(4), tone(2), noise(1)])
+
+
+def test_detect_voice_cuts_long_silences_and_bridges_short_ones():
+    regions = AudioConditioner(min_silence=0.6).detect_voice(speech_with_pauses(), SR)
+    assert len(regions) == 2
+    (first_start, first_end), (second_start, second_end) = [(s / SR, e / SR) for s, e in regions]
+    # Padding may widen each region by ~padding seconds on either side
+    assert first_start == pytest.approx(2.0, abs=0.25)
+    assert first_end == pytest.approx(6.3, abs=0.25)
+    assert second_start == pytest.approx(10.3, abs=0.25)
+    assert second_end == pytest.approx(12.3, abs=0.25)
+
+
+def test_detect_voice_keeps_continuous_speech_whole():
+    samples = tone(5)
+    assert AudioConditioner().detect_voice(samples, SR) == [(0, len(samples))]
+
+
+@pytest.mark.parametrize("tempo", [1.0, 1.25])
+def test_offset_map_round_trips(tempo):
+    conditioner = AudioConditioner(tempo=tempo)
+    regions = [(2 * SR, 6 * SR), (10 * SR, 12 * SR)]
+    offset_map = conditioner.build_offset_map(regions, SR)
+
+    assert offset_map[0]['start'] == 0.0
+    assert offset_map[0]['end'] == pytest.approx(4 / tempo)
+    assert offset_map[1]['end'] == pytest.approx(6 / tempo)
+
+    for original in [2.0, 3.5, 5.9, 10.0, 11.0, 11.9]:
+        region = next(r for r in regions if r[0] / SR <= original < r[1] / SR)
+        kept_before = sum(e - s for s, e in regions if e <= region[0]) / SR
+        processed = (kept_before + original - region[0] / SR) / tempo
+        assert conditioner.to_original_time(offset_map, processed) == pytest.approx(original)
+
+
+@pytest.mark.parametrize("tempo", [1.0, 1.25])
+def test_condition_reports_minutes_saved(monkeypatch, tmp_path, tempo):
+    samples = np.concatenate([tone(30), noise(30), tone(30)])
+    conditioner = AudioConditioner(tempo=tempo)
+    encoded = {}
+    monkeypatch.setattr(conditioner, "_decode", lambda path: samples)
+    monkeypatch.setattr(conditioner, "_encode", lambda voiced, path: encoded.update(n=len(voiced)))
+
+    result = conditioner.condition("in.mp3", str(tmp_path / "out.mp3"))
+
+    assert result['original_minutes'] == pytest.approx(1.5)
+    kept_minutes = encoded['n'] / SR / 60
+    assert kept_minutes == pytest.approx(1.0, abs=0.02)
+    assert result['processed_minutes'] == pytest.approx(kept_minutes / tempo)
+    assert result['minutes_saved'] == pytest.approx(1.5 - kept_minutes / tempo)
+
+
+def test_condition_wraps_ffmpeg_failures(monkeypatch, tmp_path):
+    conditioner = AudioConditioner()
+
+    def broken_decode(path):
+        raise OSError("ffmpeg missing")
+    monkeypatch.setattr(conditioner, "_decode", broken_decode)
+
+    with pytest.raises(Exception, match="Audio conditioning failed"):
+        conditioner.condition("in.mp3", str(tmp_path / "out.mp3"))
+
+
+def test_service_falls_back_to_unconditioned_audio(tmp_path):
+    from src.transcription import VideoTranscriptionService
+
+    audio_path = tmp_path / "audio.mp3"
+    audio_path.write_bytes(b"audio")
+    sent = {}
+
+    class FakeLoader:
+        def download_and_convert(self, url):
+            return {'audio_path': str(audio_path), 'title': 'Talk', 'duration': 60, 'chapters': []}
+
+    class FakeTranscriber:
+        def transcribe_segments(self, audio_file_path, language):
+            sent['path'] = audio_file_path
+            return {'text': 'hello', 'segments': [{'start': 1.0, 'end': 2.0, 'text': 'hello'}]}
+
+    class FailingConditioner:
+        def condition(self, audio_path, output_path):
+            raise Exception("Audio conditioning failed: atempo out of range")
+
+    service = VideoTranscriptionService(api_key="key", output_dir=str(tmp_path),
+                                        conditioner=FailingConditioner())
+    service.loader = FakeLoader()
+    service.transcriber = FakeTranscriber()
+
+    result = service.transcribe_youtube_video_with_metadata("https://youtu.be/x")
+
+    assert sent['path'] == str(audio_path)
+    assert result['segments'][0]['start'] == 1.0
+    assert 'audio_minutes_saved' not in result['metadata']
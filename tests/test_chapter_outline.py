@@ -0,0 +1,28 @@
+from src.content_processing import ContentAnalyzer
+
+CHAPTERS = [
+    {'title': 'Intro music', 'start_time': 0, 'end_time': 10},
+    {'title': 'Basics', 'start_time': 10, 'end_time': 50},
+    {'title': 'Break', 'start_time': 50, 'end_time': 60},
+    {'title': 'Advanced', 'start_time': 60, 'end_time': 100},
+]
+SEGMENTS = [{'start': t, 'end': t + 5, 'text': f'w{t}'}
+            for t in list(range(10, 50, 5)) + list(range(60, 100, 5))]
+
+
+def test_chapters_split_to_hit_num_slides():
+    sections = ContentAnalyzer('key', 4).create_outline_from_chapters(CHAPTERS, SEGMENTS)
+    assert [s['title'] for s in sections] == [
+        'Basics (part 1)', 'Basics (part 2)', 'Advanced (part 1)', 'Advanced (part 2)'
+    ]
+    assert sections[0]['transcript'] == 'w10 w15 w20 w25'
+
+
+def test_empty_chapters_merged_into_neighbours():
+    sections = ContentAnalyzer('key', 2).create_outline_from_chapters(CHAPTERS, SEGMENTS)
+    assert [s['title'] for s in sections] == ['Basics', 'Advanced']
+    assert all(s['transcript'] for s in sections)
+
+
+def test_no_chapter_text_returns_empty_outline():
+    assert ContentAnalyzer('key', 2).create_outline_from_chapters(CHAPTERS, []) == []
@@ -0,0 +1,70 @@
+import pytest
+from src.content_processing import TranscriptCompactor
+
+
+@pytest.fixture
+def compactor():
+    return TranscriptCompactor(count_tokens=lambda text: len(text.split()))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Um, so we, uh, start here.", "So we start here."),
+    ("I- I think so.", "I think so."),
+    ("It is the the key idea.", "It is the key idea."),
+    ("Bring fruit, like, apples.", "Bring fruit, apples."),
+    ("You know, it scales.", "It scales."),
+    ("It scales, I mean, mostly.", "It scales, mostly."),
+])
+def test_disfluencies_removed(compactor, text, expected):
+    assert compactor.remove_disfluencies(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "We cover pre- and post-processing.",
+    "I'd like, maybe, a second pass.",
+    "Use things like, apples.",
+    "HM Treasury published it.",
+    "The 10 10 rule applies.",
+    "I know that that is true.",
+    "It went from 20- 200 people.",
+    "Do you know, what the answer is?",
+    "Uh-huh, that works.",
+])
+def test_meaning_preserved(compactor, text):
+    assert compactor.remove_disfluencies(text) == text
+
+
+def test_near_duplicates_and_sponsor_reads_dropped(compactor):
+    text = ("Gradient descent updates the weights iteratively. "
+            "This video is sponsored by Acme, use code GIST. "
+            "Gradient descent updates the weights iteratively! "
+            "Okay.")
+    compacted, stats = compactor.compact(text)
+    assert compacted == "Gradient descent updates the weights iteratively."
+    assert stats['sentences_before'] == 4
+    assert stats['sentences_after'] == 1
+    assert stats['tokens_after'] < stats['tokens_before']
+
+
+def test_token_budget_drops_low_information_sentences(compactor):
+    compactor.token_budget = 8
+    text = ("Backpropagation computes gradients through every layer. "
+            "So we did this and then we did that. "
+            "Dropout regularizes networks.")
+    compacted, stats = compactor.compact(text)
+    assert stats['tokens_after'] <= 8
+    assert "Backpropagation" in compacted or "Dropout" in compacted
+    assert "did that" not in compacted
+
+
+def test_answers_and_negations_kept(compactor):
+    text = ("Does the vaccine cause autism? No. It does not. "
+            "Researchers tested millions of children. Okay. Yeah, right.")
+    compacted, _ = compactor.compact(text)
+    assert compacted == ("Does the vaccine cause autism? No. It does not. "
+                         "Researchers tested millions of children.")
+
+
+def test_backchannel_after_question_is_an_answer(compactor):
+    compacted, _ = compactor.compact("Would you use it again? Sure. Uh-huh.")
+    assert compacted == "Would you use it again? Sure."
@@ -0,0 +1,76 @@
+import threading
+import time
+import pytest
+from src.pipeline.executor import Pipeline, PipelineCancelled
+
+
+def test_stages_receive_dependency_outputs():
+    pipeline = Pipeline()
+    pipeline.add_stage('a', lambda: 2)
+    pipeline.add_stage('b', lambda a, x: a * x, inputs=('a', 'x'))
+    assert pipeline.run({'x': 3})['b'] == 6
+
+
+def test_timeout_measured_from_stage_start_not_submit():
+    pipeline = Pipeline(max_workers=1)
+    pipeline.add_stage('slow', lambda: time.sleep(0.6) or 'slow')
+    pipeline.add_stage('quick', lambda: 'quick', timeout=0.3)
+    values = pipeline.run()
+    assert values['quick'] == 'quick'
+
+
+def test_timeout_without_fallback_fails_run():
+    pipeline = Pipeline()
+    pipeline.add_stage('slow', lambda: time.sleep(1), timeout=0.1)
+    with pytest.raises(TimeoutError):
+        pipeline.run()
+
+
+def test_timeout_with_fallback_publishes_value_and_continues():
+    pipeline = Pipeline()
+    pipeline.add_stage('title', lambda: time.sleep(1) or 'late', timeout=0.1, on_timeout='Default')
+    pipeline.add_stage('deck', lambda title: title.upper(), inputs=('title',))
+    started = time.monotonic()
+    assert pipeline.run()['deck'] == 'DEFAULT'
+    assert time.monotonic() - started < 0.9
+
+
+def test_cancel_stops_run_and_does_not_stick():
+    pipeline = Pipeline()
+    pipeline.add_stage('a', lambda: time.sleep(0.8))
+    threading.Timer(0.1, pipeline.cancel).start()
+    with pytest.raises(PipelineCancelled):
+        pipeline.run()
+
+    pipeline = Pipeline()
+    pipeline.add_stage('a', lambda: 1)
+    pipeline.cancel()
+    assert pipeline.run()['a'] == 1
+
+
+def test_stopping_the_calling_thread_cancels_stages_in_flight():
+    class StopScript(BaseException):
+        """Like Streamlit's StopException, which is raised from inside on_poll."""
+
+    pipeline = Pipeline()
+    paid_calls = []
+    finished = threading.Event()
+
+    def slow_stage():
+        time.sleep(0.8)  # still running at the first poll
+        try:
+            pipeline.check_cancelled()
+            paid_calls.append('second call')
+        finally:
+            finished.set()
+
+    def on_poll():
+        raise StopScript()
+
+    pipeline.add_stage('slow', slow_stage)
+    with pytest.raises(StopScript):
+        pipeline.run(on_poll=on_poll)
+
+    assert pipeline.cancelled
+    assert finished.wait(2)
+    assert paid_calls == []
@@ -0,0 +1,54 @@
+from src.pipeline import build_presentation_pipeline
+
+
+class FakeService:
+    def transcribe_youtube_video_with_metadata(self, url, language):
+        return {'text': "Um, neural networks learn. Neural networks learn.", 'segments': [],
+                'metadata': {'title': 'Talk'}}
+
+
+class FakeCompactor:
+    def compact(self, text):
+        return "compacted", {'tokens_before': 6, 'tokens_after': 1,
+                             'sentences_before': 2, 'sentences_after': 1}
+
+    def compact_segments(self, segments):
+        return segments
+
+
+class RecordingAnalyzer:
+    ground_sections = False
+
+    def __init__(self):
+        self.outline_input = None
+
+    def build_outline(self, transcript, chapters, segments):
+        self.outline_input = transcript
+        return []
+
+    def print_slides(self, slides):
+        pass
+
+
+class FakeSlideGenerator:
+    def generate_presentation(self, **kwargs):
+        pass
+
+
+def run_with_similarity(tmp_path, similarity):
+    analyzer = RecordingAnalyzer()
+    pipeline = build_presentation_pipeline(
+        FakeService(), analyzer, None, FakeSlideGenerator(), num_slides=1, num_images=0,
+        transcript_backup=str(tmp_path / "transcript.pkl"),
+        compactor=FakeCompactor(), fidelity_check=lambda original, compacted: similarity
+    )
+    pipeline.run({'youtube_url': 'https://youtu.be/x', 'output_filename': 'out.pptx'})
+    return analyzer.outline_input
+
+
+def test_compacted_transcript_used_when_fidelity_kept(tmp_path):
+    assert run_with_similarity(tmp_path, 0.95) == "compacted"
+
+
+def test_falls_back_to_original_below_min_fidelity(tmp_path):
+    assert run_with_similarity(tmp_path, 0.5).startswith("Um, neural networks")
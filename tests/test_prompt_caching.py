@@ -0,0 +1,157 @@
+import threading
+from src.content_processing import ContentAnalyzer
+from src.model_routing import ModelRouter
+from src.pipeline import build_presentation_pipeline
+
+TRANSCRIPT = "Neural networks learn weights with gradient descent. " * 40
+OUTLINE = "\n".join(
+    f"SECTION: Topic {i}\n- point a{i}\n- point b{i}\n- point c{i}" for i in range(3)
+)
+SLIDE = "TITLE: Slide\nSLIDE CONTENT:\n- one\n- two\n- three\nSPEAKER NOTES:\n- note"
+
+
+class Response:
+    def __init__(self, content, usage):
+        self.content = content
+        self.response_metadata = {'usage': usage}
+
+
+class RecordingFactory:
+    """Stands in for ChatAnthropic: records every payload and reports cache usage per model."""
+
+    def __init__(self):
+        self.payloads = []
+        self.usages = []
+        self._warm_models = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, model):
+        factory = self
+
+        class RecordingLLM:
+            def invoke(self, messages):
+                marked = any('cache_control' in block for block in messages[1].content)
+                with factory._lock:
+                    warm = model in factory._warm_models
+                    if marked:
+                        factory._warm_models.add(model)
+                    usage = {
+                        'input_tokens': 40 if marked else 440,
+                        'cache_read_input_tokens': 400 if marked and warm else 0,
+                        'cache_creation_input_tokens': 400 if marked and not warm else 0,
+                    }
+                    factory.payloads.append((model, messages))
+                    factory.usages.append(usage)
+                instructions = messages[1].content[-1]['text']
+                return Response(OUTLINE if 'main sections' in instructions else SLIDE, usage)
+
+        return RecordingLLM()
+
+
+def test_shared_prefix_layout_and_cache_accounting():
+    factory = RecordingFactory()
+    router = ModelRouter()
+    analyzer = ContentAnalyzer('key', 3, router=router, ground_sections=True, llm_factory=factory)
+
+    analyzer.analyze_transcript(TRANSCRIPT)
+
+    assert len(factory.payloads) == 4  # outline + 3 sections
+    system_prompts = {messages[0].content for _, messages in factory.payloads}
+    transcript_blocks = [messages[1].content[0] for _, messages in factory.payloads]
+    assert len(system_prompts) == 1
+    assert all(block['text'] == transcript_blocks[0]['text'] for block in transcript_blocks)
+    assert transcript_blocks[0]['text'] == f"Transcript: {TRANSCRIPT}"
+
+    # The outline runs on another model, so marking its prefix would only pay the write premium
+    assert all('cache_control' not in block for block in factory.payloads[0][1][1].content)
+    for _, messages in factory.payloads[1:]:
+        blocks = messages[1].content
+        assert [('cache_control' in block) for block in blocks] == [True] + [False] * (len(blocks) - 1)
+        assert blocks[0]['cache_control'] == {'type': 'ephemeral'}
+        assert len(blocks) == 2  # per-call instructions come after the transcript
+
+    section_suffixes = [messages[1].content[1]['text'] for _, messages in factory.payloads[1:]]
+    assert all('Create presentation slide content' in text for text in section_suffixes)
+
+    assert router.cache_stats['read_tokens'] == sum(u['cache_read_input_tokens'] for u in factory.usages)
+    assert router.cache_stats['written_tokens'] == sum(u['cache_creation_input_tokens'] for u in factory.usages)
+
+
+def test_cached_input_priced_below_uncached():
+    factory = RecordingFactory()
+    router = ModelRouter()
+    analyzer = ContentAnalyzer('key', 3, router=router, ground_sections=True, llm_factory=factory)
+    analyzer.analyze_transcript(TRANSCRIPT)
+
+    sections = router.stats[('anthropic', 'medium')]
+    input_price, output_price = router.prices[sections['model']]
+    full_price_input = sections['input_tokens'] * input_price / 1_000_000
+    output_cost = sections['output_tokens'] * output_price / 1_000_000
+    assert sections['cache_read_tokens'] == 800
+    assert sections['cost_usd'] - output_cost < full_price_input
+    assert 'cache=800read/400written' in router.report()
+
+    outline = router.stats[('anthropic', 'large')]
+    assert outline['cache_write_tokens'] == 0 and outline['cache_read_tokens'] == 0
+
+
+def test_sections_not_grounded_by_default_keep_their_tier():
+    factory = RecordingFactory()
+    router = ModelRouter()
+    analyzer = ContentAnalyzer('key', 3, router=router, llm_factory=factory)
+    long_transcript = "Neural networks learn weights with gradient descent. " * 10000  # > 50k tokens
+
+    analyzer.analyze_transcript(long_transcript)
+
+    section_calls = factory.payloads[1:]
+    assert all(model == router.model_for('anthropic', 'medium') for model, _ in section_calls)
+    assert all(len(messages[1].content) == 1 for _, messages in section_calls)
+    assert router.cache_stats == {'read_tokens': 0, 'written_tokens': 0}
+
+
+class FakeService:
+    def __init__(self, metadata):
+        self.metadata = metadata
+
+    def transcribe_youtube_video_with_metadata(self, url, language):
+        segments = [{'start': t, 'end': t + 5, 'text': f'w{t}'} for t in range(0, 100, 5)]
+        return {'text': TRANSCRIPT, 'segments': segments, 'metadata': self.metadata}
+
+
+class FakeSlideGenerator:
+    def generate_presentation(self, **kwargs):
+        self.slides = kwargs['slides_content']
+
+
+def run_pipeline(tmp_path, metadata, ground_sections=True):
+    factory = RecordingFactory()
+    analyzer = ContentAnalyzer('key', 3, router=ModelRouter(), ground_sections=ground_sections,
+                               llm_factory=factory)
+    slide_generator = FakeSlideGenerator()
+    pipeline = build_presentation_pipeline(
+        FakeService(metadata), analyzer, None, slide_generator, num_slides=3, num_images=0,
+        transcript_backup=str(tmp_path / "transcript.pkl")
+    )
+    values = pipeline.run({'youtube_url': 'https://youtu.be/x', 'output_filename': 'out.pptx'})
+    return values, factory, slide_generator
+
+
+def test_pipeline_warms_cache_for_shared_prefix(tmp_path):
+    values, factory, slide_generator = run_pipeline(tmp_path, {'title': 'Talk'})
+    assert values['warm_cache'] is not None
+    assert len(factory.payloads) == 4  # slide 0 expanded once, by the warm-up stage
+    assert len(slide_generator.slides) == 3
+
+
+def test_pipeline_skips_warm_up_without_grounding(tmp_path):
+    values, factory, _ = run_pipeline(tmp_path, {'title': 'Talk'}, ground_sections=False)
+    assert values['warm_cache'] is None
+    assert len(factory.payloads) == 4
+
+
+def test_pipeline_skips_warm_up_for_chapter_sections(tmp_path):
+    chapters = [{'title': f'Chapter {i}', 'start_time': i * 33, 'end_time': (i + 1) * 33}
+                for i in range(3)]
+    values, factory, _ = run_pipeline(tmp_path, {'title': 'Talk', 'chapters': chapters})
+    assert values['warm_cache'] is None
+    assert all(len(messages[1].content) == 1 for _, messages in factory.payloads)
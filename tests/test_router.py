@@ -0,0 +1,86 @@
+from src.model_routing import ModelRouter
+
+
+class RecordingCall:
+    """Stands in for a provider call: records the model used and replays canned outputs."""
+
+    def __init__(self, outputs=None, usage=None):
+        self.models = []
+        self.prompts = []
+        self.outputs = list(outputs or [])
+        self.usage = usage or {}
+
+    def __call__(self, model, prompt):
+        self.models.append(model)
+        self.prompts.append(prompt)
+        text = self.outputs.pop(0) if self.outputs else 'ok'
+        return text, dict(self.usage)
+
+
+def test_tier_follows_input_size():
+    router = ModelRouter(token_limits={'small': 5, 'medium': 10})
+    assert router.select_tier('worthiness', 3) == 'small'
+    assert router.select_tier('worthiness', 8) == 'medium'
+    assert router.select_tier('worthiness', 50) == 'large'
+
+    call = RecordingCall()
+    router.run('worthiness', 'openai', 'one two three four five six seven', call)
+    assert call.models == ['gpt-4o']
+
+
+def test_limit_on_largest_tier_stops_there():
+    router = ModelRouter(token_limits={'large': 100})
+    assert router.select_tier('outline', 1000) == 'large'
+
+    call = RecordingCall()
+    router.run('outline', 'anthropic', 'word ' * 200, call)
+    assert call.models == ['claude-3-opus-20240229']
+
+
+def test_escalation_never_drops_below_retry_route():
+    router = ModelRouter()
+    call = RecordingCall(outputs=['nope', '0.5'])
+    text = router.run('worthiness', 'openai', 'rate', call, validate=lambda t: t == '0.5')
+    assert text == '0.5'
+    # small fails, then straight to the 'retry' route (large), skipping medium
+    assert call.models == ['gpt-4o-mini', 'gpt-4-turbo-preview']
+
+
+def test_failed_escalation_returns_last_output_and_uses_retry_prompt():
+    router = ModelRouter()
+    call = RecordingCall(outputs=['bad', 'still bad'])
+    text = router.run('section', 'anthropic', 'first', call,
+                      validate=lambda t: False, retry_prompt='second')
+    assert text == 'still bad'
+    assert call.prompts == ['first', 'second']
+    assert call.models == ['claude-3-5-sonnet-20241022', 'claude-3-opus-20240229']
+
+
+def test_tier_overrides_merge_per_provider():
+    router = ModelRouter(tiers={'anthropic': {'small': 'claude-3-5-haiku-20241022'}})
+    assert router.model_for('anthropic', 'small') == 'claude-3-5-haiku-20241022'
+    assert router.model_for('anthropic', 'large') == 'claude-3-opus-20240229'
+    assert router.model_for('openai', 'small') == 'gpt-4o-mini'
+
+
+def test_report_lists_each_provider_tier():
+    router = ModelRouter()
+    router.run('section', 'anthropic', 'a b c', RecordingCall(usage={'input_tokens': 1_000_000}))
+    router.run('section', 'openai', 'a b c', RecordingCall())
+
+    assert router.stats[('anthropic', 'medium')]['cost_usd'] >= 3.0
+    assert router.stats[('openai', 'medium')]['calls'] == 1
+
+    report = router.report()
+    assert 'anthropic/medium' in report and 'claude-3-5-sonnet-20241022' in report
+    assert 'openai/medium' in report and 'gpt-4o ' in report
+    assert 'Prompt cache: 0 tokens read, 0 tokens written' in report
+
+
+def test_worthiness_defaults_when_no_tier_returns_a_number(tmp_path):
+    from src.image_service.image_generator import ImageGenerator
+
+    generator = ImageGenerator('key', output_dir=str(tmp_path), router=ModelRouter())
+    generator._invoke = RecordingCall(outputs=['High', 'Quite high'])
+    slide = {'title': 'Backprop', 'points': ['chain rule']}
+    assert generator.analyze_slide_worthiness(slide) == 0.0
@@ -0,0 +1,106 @@
+from src.content_processing import ContentAnalyzer, SectionDeduplicator
+from src.model_routing import ModelRouter
+
+NEURAL_INTRO = {
+    'title': 'Introduction to Neural Networks',
+    'key_points': ['Neural networks are layers of connected neurons',
+                   'Each neuron applies weights and an activation function',
+                   'Networks learn by adjusting weights during training'],
+}
+NEURAL_BASICS = {
+    'title': 'Neural Network Basics',
+    'key_points': ['A network stacks layers of neurons',
+                   'Neurons combine weighted inputs through an activation',
+                   'Training adjusts the weights'],
+}
+BACKPROP = {
+    'title': 'Training Neural Networks',
+    'key_points': ['Backpropagation computes gradients for each weight',
+                   'Gradient descent updates the weights',
+                   'Learning rate controls the step size'],
+}
+DEPLOYMENT = {
+    'title': 'Deploying Models to Production',
+    'key_points': ['Containerise the model server',
+                   'Monitor latency and drift',
+                   'Roll back bad releases'],
+}
+
+
+def test_paraphrased_sections_are_merged():
+    merged = SectionDeduplicator().deduplicate([NEURAL_INTRO, NEURAL_BASICS, DEPLOYMENT])
+    assert [s['title'] for s in merged] == ['Introduction to Neural Networks',
+                                            'Deploying Models to Production']
+    assert 'Training adjusts the weights' in merged[0]['key_points']
+
+
+def test_related_but_distinct_sections_are_kept():
+    sections = [NEURAL_INTRO, BACKPROP, DEPLOYMENT]
+    assert SectionDeduplicator().deduplicate(sections) == sections
+
+
+def _outline(*sections):
+    return '\n'.join(
+        f"SECTION: {s['title']}\nKEY POINTS:\n" + '\n'.join(f"- {p}" for p in s['key_points'])
+        for s in sections
+    )
+
+
+class ScriptedFactory:
+    """Stands in for ChatAnthropic, answering each outline call with the next scripted outline."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.instructions = []
+
+    def __call__(self, model):
+        factory = self
+
+        class ScriptedLLM:
+            def invoke(self, messages):
+                factory.instructions.append(messages[1].content[-1]['text'])
+                return type('Response', (), {'content': factory.responses.pop(0),
+                                             'response_metadata': {}})()
+
+        return ScriptedLLM()
+
+
+TRANSCRIPT = ' '.join([
+    "Neural networks are layers of connected neurons with weights and an activation. " * 20,
+    "Backpropagation computes gradients and gradient descent updates each weight. " * 20,
+    "Containerise the model server, monitor latency and drift, roll back releases. " * 20,
+])
+
+
+def test_top_up_replaces_merged_duplicate_in_transcript_order(capsys):
+    factory = ScriptedFactory(_outline(NEURAL_INTRO, NEURAL_BASICS, DEPLOYMENT), _outline(BACKPROP))
+    analyzer = ContentAnalyzer('key', 3, router=ModelRouter(), llm_factory=factory)
+
+    outline = analyzer.create_outline(TRANSCRIPT)
+
+    assert [s['title'] for s in outline] == ['Introduction to Neural Networks',
+                                             'Training Neural Networks',
+                                             'Deploying Models to Production']
+    assert len(factory.instructions) == 2
+    assert 'create exactly 1 main sections' in factory.instructions[1]
+    assert 'Introduction to Neural Networks' in factory.instructions[1]
+    assert 'after merging duplicates' in capsys.readouterr().out
+
+
+def test_top_up_for_short_outline_says_why(capsys):
+    factory = ScriptedFactory(_outline(NEURAL_INTRO, DEPLOYMENT), _outline(BACKPROP))
+    analyzer = ContentAnalyzer('key', 3, router=ModelRouter(), llm_factory=factory)
+
+    outline = analyzer.create_outline(TRANSCRIPT)
+
+    assert len(outline) == 3
+    out = capsys.readouterr().out
+    assert 'to reach the requested count' in out
+    assert 'after merging duplicates' not in out
+
+
+def test_no_top_up_when_outline_is_complete():
+    factory = ScriptedFactory(_outline(NEURAL_INTRO, BACKPROP, DEPLOYMENT))
+    analyzer = ContentAnalyzer('key', 3, router=ModelRouter(), llm_factory=factory)
+    assert len(analyzer.create_outline(TRANSCRIPT)) == 3
+    assert len(factory.instructions) == 1